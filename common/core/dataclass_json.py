@@ -4,6 +4,9 @@ import orjson
 
 # noinspection PyUnresolvedReferences
 class JsonMixin:
+    # Keep the mixin slot-free so slotted dataclasses do not regain a __dict__.
+    __slots__ = ()
+
     @classmethod
     def load(cls, d: Dict):
         return cls.Schema().load(d)
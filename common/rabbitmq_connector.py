@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import random
 from typing import Optional
 
 from aiormq.exceptions import AMQPConnectionError
@@ -8,6 +9,8 @@ from .rpc.rabbitmq_client import RabbitMQClient
 
 _DEFAULT_MAX_RETRIES = 5
 _DEFAULT_RETRY_DELAY = 2.0
+_DEFAULT_MAX_DELAY = 60.0
+_DEFAULT_BACKOFF_MULTIPLIER = 2.0
 
 logger = logging.getLogger(__name__)
 
@@ -32,14 +35,18 @@ class RabbitmqConnector:
                       password: str,
                       connection_name: Optional[str] = None,
                       max_retries: int = _DEFAULT_MAX_RETRIES,
-                      retry_delay: float = _DEFAULT_RETRY_DELAY):
+                      retry_delay: float = _DEFAULT_RETRY_DELAY,
+                      max_delay: float = _DEFAULT_MAX_DELAY,
+                      backoff_multiplier: float = _DEFAULT_BACKOFF_MULTIPLIER):
+        # The client holds no connection state until connect() succeeds,
+        # so a single instance can be reused across retries.
+        client = RabbitMQClient(host=host,
+                                port=int(port),
+                                login=login,
+                                password=password,
+                                connection_name=connection_name)
         attempt = 0
         while True:
-            client = RabbitMQClient(host=host,
-                                    port=int(port),
-                                    login=login,
-                                    password=password,
-                                    connection_name=connection_name)
             try:
                 return await client.connect()
             except (AMQPConnectionError, OSError) as exc:
@@ -51,11 +58,15 @@ class RabbitmqConnector:
                         exc,
                     )
                     raise exc
+                # Exponential backoff with jitter so parallel workers do not
+                # retry in lockstep while RabbitMQ recovers.
+                delay = min(retry_delay * backoff_multiplier ** (attempt - 1), max_delay)
+                delay *= 0.5 + random.random() * 0.5
                 logger.warning(
                     "Failed to connect to RabbitMQ (attempt %s/%s). Retrying in %.1f seconds: %s",
                     attempt,
                     max_retries,
-                    retry_delay,
+                    delay,
                     exc,
                 )
-                await asyncio.sleep(retry_delay)
+                await asyncio.sleep(delay)
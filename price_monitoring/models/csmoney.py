@@ -31,7 +31,7 @@ class CsmoneyItemCategory(Enum):
 
 
 @add_schema
-@dataclass
+@dataclass(slots=True)
 class CsmoneyItem(JsonMixin):
     name: MarketName
     price: float  # price including overpay
@@ -49,11 +49,11 @@ class CsmoneyItemPack(JsonMixin):
     items: List[CsmoneyItem] = field(default_factory=list)
 
 
-@add_schema
-@dataclass
-class CsmoneyTask(JsonMixin):
-    # e.g.: https://cs.money/csgo/trade?minPrice=10&maxPrice=20
-    url: str
+@add_schema
+@dataclass
+class CsmoneyTask(JsonMixin):
+    # e.g.: https://cs.money/csgo/trade?minPrice=10&maxPrice=20
+    url: str
 
 
 @add_schema
@@ -10,6 +10,10 @@ class MaxAttemptsReachedError(Exception):
 class AbstractCsmoneyParser(ABC):
     @abstractmethod
     async def parse(
-        self, url: str, result_queue: AbstractCsmoneyWriter, max_attempts: int = 10
+        self,
+        url: str,
+        result_queue: AbstractCsmoneyWriter,
+        max_attempts: int = 10,
+        deadline: float | None = None,
     ) -> None:
         ...
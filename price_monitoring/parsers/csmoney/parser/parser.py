@@ -1,9 +1,19 @@
-import json
+import asyncio
 import logging
+import random
 import re
 from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterator, Mapping
 
+import orjson
 from aiohttp import ClientSession
+from multidict import CIMultiDict, CIMultiDictProxy
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None  # optional fallback for pages the substring scan cannot handle
 
 from proxy_http.async_proxies_concurrent_limiter import AsyncSessionConcurrentLimiter
 from proxy_http.decorators import catch_aiohttp
@@ -15,10 +25,10 @@ from ....queues import AbstractCsmoneyWriter
 _RESPONSE_TIMEOUT = 10
 _POSTPONE_DURATION = 25
 _MAX_ATTEMPTS_DEFAULT = 300
-_NEXT_DATA_PATTERN = re.compile(
-    r'<script id="__NEXT_DATA__" type="application/json"[^>]*>(?P<data>.*?)</script>',
-    re.DOTALL,
-)
+_RETRY_BASE_DELAY = 0.5
+_RETRY_MAX_DELAY = 30.0
+_NEXT_DATA_OPEN_TAG = '<script id="__NEXT_DATA__"'
+_NEXT_DATA_CLOSE_TAG = "</script>"
 _REQUEST_HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -35,6 +45,8 @@ _REQUEST_HEADERS = {
     "Sec-Fetch-User": "?1",
     "Upgrade-Insecure-Requests": "1",
 }
+# Built once so aiohttp does not convert and validate a plain dict per request.
+_REQUEST_HEADERS_CI = CIMultiDictProxy(CIMultiDict(_REQUEST_HEADERS))
 
 _CLOUDFLARE_KEYWORDS = (
     "just a moment",
@@ -42,24 +54,52 @@ _CLOUDFLARE_KEYWORDS = (
     "cf-browser-verification",
     "cf-chl",
 )
-
-logger = logging.getLogger(__name__)
-
-
+# Single case-insensitive scan instead of html.lower() plus one pass per keyword.
+_CLOUDFLARE_PATTERN = re.compile(
+    "|".join(re.escape(keyword) for keyword in _CLOUDFLARE_KEYWORDS),
+    re.IGNORECASE,
+)
+# Challenge pages are small and keep their markers in <head>, so scanning
+# beyond the first kilobytes is wasted work.
+_CLOUDFLARE_SCAN_LIMIT = 8 * 1024
+_CLOUDFLARE_MAX_BODY_SIZE = 64 * 1024
+_STREAM_CHUNK_SIZE = 16 * 1024
+
+# Direct value->member lookup is ~3x cheaper than Enum.__call__ per item.
+_TYPE_MAP = {category.value: category for category in CsmoneyItemCategory}
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1024)
 def _csmoney_unix_to_datetime(unix: int | None) -> datetime | None:
     if unix:
         return datetime.fromtimestamp(unix / 1000, timezone.utc)
     return None
-
-
+
+
 def _extract_next_data(payload: str | dict) -> dict:
     if isinstance(payload, dict):
         return payload
 
-    match = _NEXT_DATA_PATTERN.search(payload)
-    if not match:
-        raise ValueError("__NEXT_DATA__ script not found in cs.money response")
-    return json.loads(match.group("data"))
+    try:
+        # str.find uses memmem-style scanning, unlike a backtracking regex
+        # which would traverse the whole multi-hundred-KB document.
+        tag_start = payload.find(_NEXT_DATA_OPEN_TAG)
+        if tag_start < 0:
+            raise ValueError("__NEXT_DATA__ script not found in cs.money response")
+        data_start = payload.find(">", tag_start) + 1
+        data_end = payload.find(_NEXT_DATA_CLOSE_TAG, data_start)
+        if data_start == 0 or data_end < 0:
+            raise ValueError("__NEXT_DATA__ script is malformed in cs.money response")
+        return orjson.loads(payload[data_start:data_end])
+    except ValueError:
+        if HTMLParser is None:
+            raise
+        node = HTMLParser(payload).css_first("script#__NEXT_DATA__")
+        if node is None:
+            raise
+        return orjson.loads(node.text())
 
 
 def _extract_skins(data: dict) -> list[dict]:
@@ -77,98 +117,170 @@ def _extract_skins(data: dict) -> list[dict]:
     return skins
 
 
-def _is_cloudflare_challenge(html: str) -> bool:
-    lowered = html.lower()
-    return any(keyword in lowered for keyword in _CLOUDFLARE_KEYWORDS)
+def _parse_payload_sync(payload: str | dict) -> list[dict]:
+    return _extract_skins(_extract_next_data(payload))
+
+
+def _is_cloudflare_challenge(status: int, headers: Mapping[str, str], html: str) -> bool:
+    if "CF-Mitigated" in headers:
+        return True
+    served_by_cloudflare = headers.get("Server", "").lower().startswith("cloudflare")
+    if not served_by_cloudflare and status == 200 and len(html) > _CLOUDFLARE_MAX_BODY_SIZE:
+        return False
+    return _CLOUDFLARE_PATTERN.search(html, 0, _CLOUDFLARE_SCAN_LIMIT) is not None
+
+
+def _iter_items(json_item) -> Iterator[CsmoneyItem]:
+    # Callers are expected to have filtered out items without "fullName".
+    name = patch_market_name(json_item["fullName"])
+    price = json_item["price"]
+    name_id = json_item["nameId"]
+    type_ = _TYPE_MAP[json_item["type"]]
+    stack_items = json_item.get("stackItems")
+    overpay = json_item.get("overpay", None)
+    overpay_float = overpay.get("float", None) if overpay else None
+    yield CsmoneyItem(
+        name=name,
+        price=price,
+        asset_id=str(json_item["assetId"]),
+        name_id=name_id,
+        type_=type_,
+        float_=json_item.get("float", None),
+        unlock_timestamp=_csmoney_unix_to_datetime(json_item.get("tradeLock", None)),
+        overpay_float=overpay_float,
+    )
+    is_stack = stack_items is not None and "stackSize" in json_item and "stackId" in json_item
+    if is_stack:
+        for stack_item in stack_items:
+            yield CsmoneyItem(
+                name=name,
+                price=price,
+                asset_id=str(stack_item["id"]),
+                name_id=name_id,
+                type_=type_,
+                float_=stack_item.get("float", None),
+                unlock_timestamp=_csmoney_unix_to_datetime(stack_item["tradeLock"]),
+                overpay_float=None,
+            )
 
 
 def _create_items(json_item) -> list[CsmoneyItem]:
-    if "fullName" not in json_item:
-        return []
-    name = patch_market_name(json_item["fullName"])
-    overpay = json_item.get("overpay", None)
-    overpay_float = overpay.get("float", None) if overpay else None
-    items = [
-        CsmoneyItem(
-            name=name,
-            price=json_item["price"],
-            asset_id=str(json_item["assetId"]),
-            name_id=json_item["nameId"],
-            type_=CsmoneyItemCategory(json_item["type"]),
-            float_=json_item.get("float", None),
-            unlock_timestamp=_csmoney_unix_to_datetime(json_item.get("tradeLock", None)),
-            overpay_float=overpay_float,
-        )
-    ]
-    is_stack = "stackSize" in json_item and "stackId" in json_item and "stackItems" in json_item
-    if is_stack:
-        for stack_item in json_item["stackItems"]:
-            items.append(
-                CsmoneyItem(
-                    name=name,
-                    price=json_item["price"],
-                    asset_id=str(stack_item["id"]),
-                    name_id=json_item["nameId"],
-                    type_=CsmoneyItemCategory(json_item["type"]),
-                    float_=stack_item.get("float", None),
-                    unlock_timestamp=_csmoney_unix_to_datetime(stack_item["tradeLock"]),
-                    overpay_float=None,
-                )
-            )
-    return items
-
-
+    if "fullName" not in json_item:
+        return []
+    return list(_iter_items(json_item))
+
+
 @catch_aiohttp(logger)
 async def _request(session: ClientSession, url: str) -> str | dict | None:
-    async with session.get(url, timeout=_RESPONSE_TIMEOUT, headers=_REQUEST_HEADERS) as response:
+    async with session.get(
+        url, timeout=_RESPONSE_TIMEOUT, headers=_REQUEST_HEADERS_CI
+    ) as response:
         response.raise_for_status()
         content_type = response.headers.get("Content-Type", "")
         if "json" in content_type:
             return await response.json()
 
-        text = await response.text()
-        if _is_cloudflare_challenge(text):
-            logger.warning("Cloudflare challenge detected for %s", url)
-            return None
-        return text
+        # Stream the body so challenge responses can be dropped after the
+        # first chunk instead of being downloaded in full.
+        buffer = bytearray()
+        async for chunk in response.content.iter_chunked(_STREAM_CHUNK_SIZE):
+            if not buffer:
+                prefix = chunk.decode("utf-8", "replace")
+                if _is_cloudflare_challenge(response.status, response.headers, prefix):
+                    logger.warning("Cloudflare challenge detected for %s", url)
+                    response.close()
+                    return None
+            buffer += chunk
+        # cs.money serves UTF-8; decoding explicitly sidesteps aiohttp's
+        # charset detection on large bodies.
+        return bytes(buffer).decode("utf-8", errors="replace")
+
+
+async def _sleep_before_retry(failed_attempts: int) -> None:
+    # Exponential backoff with jitter so a Cloudflare campaign does not
+    # make the retry loop spin through proxies in lockstep.
+    delay = min(_RETRY_BASE_DELAY * 2 ** min(failed_attempts, 8), _RETRY_MAX_DELAY)
+    await asyncio.sleep(delay * (0.5 + random.random() * 0.5))
 
 
 async def _process_items(items_data: list[dict], result_queue: AbstractCsmoneyWriter) -> None:
-    pack = CsmoneyItemPack()
-    for json_item in items_data:
-        items = _create_items(json_item)
-        for item in items:
-            pack.items.append(item)
-    await result_queue.put(pack)
-
-
+    # Single fused pass: no intermediate per-item lists between projection
+    # and pack construction.
+    items = [
+        item
+        for json_item in items_data
+        if "fullName" in json_item
+        for item in _iter_items(json_item)
+    ]
+    await result_queue.put(CsmoneyItemPack(items=items))
+
+
 class CsmoneyParserImpl(AbstractCsmoneyParser):
-    def __init__(self, limiter: AsyncSessionConcurrentLimiter):
+    def __init__(self, limiter: AsyncSessionConcurrentLimiter, max_concurrency: int = 16):
         self._limiter = limiter
+        # Caps in-flight requests to cs.money regardless of caller fan-out.
+        # A condition-guarded counter instead of asyncio.Semaphore so the
+        # limit can be resized at runtime via set_limit.
+        self._condition = asyncio.Condition()
+        self._active_requests = 0
+        self._max_concurrency = max_concurrency
+
+    async def _acquire(self) -> None:
+        async with self._condition:
+            while self._active_requests >= self._max_concurrency:
+                await self._condition.wait()
+            self._active_requests += 1
+
+    async def _release(self) -> None:
+        async with self._condition:
+            self._active_requests -= 1
+            self._condition.notify()
+
+    async def set_limit(self, max_concurrency: int) -> None:
+        async with self._condition:
+            self._max_concurrency = max_concurrency
+            self._condition.notify_all()
 
     async def parse(
-        self, url: str, result_queue: AbstractCsmoneyWriter, max_attempts: int = _MAX_ATTEMPTS_DEFAULT
+        self,
+        url: str,
+        result_queue: AbstractCsmoneyWriter,
+        max_attempts: int = _MAX_ATTEMPTS_DEFAULT,
+        deadline: float | None = None,
     ) -> None:
+        loop = asyncio.get_running_loop()
+        end_time = loop.time() + deadline if deadline is not None else None
         failed_attempts = 0
         while failed_attempts <= max_attempts:
+            if end_time is not None and loop.time() > end_time:
+                raise MaxAttemptsReachedError()
             session = await self._limiter.get_available(_POSTPONE_DURATION)
-            payload = await _request(session, url)
+            await self._acquire()
+            try:
+                payload = await _request(session, url)
+            finally:
+                await self._release()
             if not payload:
                 logger.info(
                     "Failed to load cs.money page",
                     extra={"attempt": failed_attempts, "url": url},
                 )
                 failed_attempts += 1
+                if failed_attempts <= max_attempts:
+                    await _sleep_before_retry(failed_attempts)
                 continue
 
             logger.info("Successfully got a response for %s", url)
 
             try:
-                next_data = _extract_next_data(payload)
-                skins_data = _extract_skins(next_data)
+                # CPU-bound on large pages; run off-loop so concurrent
+                # parses keep being serviced.
+                skins_data = await asyncio.to_thread(_parse_payload_sync, payload)
             except ValueError as exc:
                 logger.exception("Failed to parse cs.money page", exc_info=exc)
                 failed_attempts += 1
+                if failed_attempts <= max_attempts:
+                    await _sleep_before_retry(failed_attempts)
                 continue
 
             await _process_items(skins_data, result_queue)
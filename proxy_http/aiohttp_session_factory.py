@@ -1,19 +1,27 @@
 from typing import Optional, Mapping
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, TCPConnector
 
 from proxy_http.aiohttp_addons.aihttp_socks_connector import ProxyConnector
 from proxy_http.proxy import Proxy
 
+# Keep connections warm between parse cycles and cache DNS answers so
+# retries do not pay for new TCP/TLS handshakes and lookups.
+_CONNECTOR_KWARGS = {
+    "limit_per_host": 64,
+    "keepalive_timeout": 75,
+    "ttl_dns_cache": 300,
+}
+
 
 class AiohttpSessionFactory:
     @staticmethod
     def create_session() -> ClientSession:
-        return ClientSession()
+        return ClientSession(connector=TCPConnector(**_CONNECTOR_KWARGS))
 
     @staticmethod
     def create_session_with_proxy(
         proxy: Proxy, headers: Optional[Mapping[str, str]] = None
     ) -> ClientSession:
-        connector = ProxyConnector.from_url(proxy.serialize(), ssl=False)
+        connector = ProxyConnector.from_url(proxy.serialize(), ssl=False, **_CONNECTOR_KWARGS)
         return ClientSession(connector=connector, headers=headers)
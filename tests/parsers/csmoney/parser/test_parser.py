@@ -172,9 +172,16 @@ def test_create_items_with_stack_and_tradelock():
 
 
 def test_is_cloudflare_challenge():
-    assert _is_cloudflare_challenge("<title>Just a moment...</title>")
-    assert _is_cloudflare_challenge("CF-Mitigated"), "check is case insensitive"
-    assert not _is_cloudflare_challenge("<html><body>ok</body></html>")
+    assert _is_cloudflare_challenge(403, {}, "<title>Just a moment...</title>")
+    assert _is_cloudflare_challenge(503, {}, "CF-Mitigated"), "check is case insensitive"
+    assert _is_cloudflare_challenge(200, {"CF-Mitigated": "challenge"}, "<html></html>")
+    assert not _is_cloudflare_challenge(200, {}, "<html><body>ok</body></html>")
+
+
+def test_is_cloudflare_challenge__skips_scan_for_large_pages():
+    large_html = "<html>" + "x" * 100_000 + "just a moment</html>"
+    assert not _is_cloudflare_challenge(200, {"Server": "nginx"}, large_html)
+    assert _is_cloudflare_challenge(200, {"Server": "cloudflare"}, "just a moment")
 
 
 @pytest.mark.asyncio
@@ -244,6 +251,27 @@ async def test_parse__raises_when_max_attempts_reached(
     assert result_queue_fixture.put.call_count == 0
 
 
+@pytest.mark.asyncio
+async def test_parse__raises_when_deadline_exceeded(
+    parser_fixture, result_queue_fixture
+):
+    with aioresponses() as mocked:
+        mocked.get(
+            "https://cs.money/csgo/trade?minPrice=0.2&maxPrice=0.3",
+            exception=aiohttp.ClientConnectionError(),
+            repeat=True,
+        )
+
+        with pytest.raises(MaxAttemptsReachedError):
+            await parser_fixture.parse(
+                "https://cs.money/csgo/trade?minPrice=0.2&maxPrice=0.3",
+                result_queue_fixture,
+                deadline=0.1,
+            )
+
+    assert result_queue_fixture.put.call_count == 0
+
+
 @pytest.mark.asyncio
 async def test_parse__retries_when_cloudflare_blocks_request(
     parser_fixture, result_queue_fixture, response_fixture